@@ -1,12 +1,26 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import psycopg2
+import pyarrow as pa
+import pyarrow.compute as pa_compute
+import pyarrow.csv as pa_csv
+import pyarrow.feather as pa_feather
 from sqlalchemy import create_engine
+import hashlib
+import io
+import os
+import shutil
+import stat
 import subprocess
-import time
+import sys
+import tempfile
+import uuid
 
 # Page configuration
 st.set_page_config(page_title="Market Data Dashboard", layout="wide")
@@ -57,6 +71,11 @@ PG_PASSWORD = st.secrets["postgresql"]["password"]
 # SQLAlchemy connection string for pandas
 pg_connection_string = f"postgresql://{PG_USER}:{PG_PASSWORD}@{PG_HOST}:{PG_PORT}/{PG_DATABASE}"
 
+# Function to get the shared SQLAlchemy engine, so its connection pool survives reruns
+@st.cache_resource
+def get_engine():
+    return create_engine(pg_connection_string, pool_size=5, pool_pre_ping=True)
+
 if st.button("Test DB Connection"):
     try:
         conn = psycopg2.connect(
@@ -82,41 +101,38 @@ if 'db_connected' not in st.session_state:
 if 'data_last_refreshed' not in st.session_state:
     st.session_state.data_last_refreshed = None
 
+# Row counts and last update of every table, in a single round trip. The
+# sidebar shows the counts and market_index's last update; together they also
+# identify the data a disk snapshot was taken from
+TABLE_STATS_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM market_index),
+        (SELECT COUNT(*) FROM market_stocks),
+        (SELECT COUNT(*) FROM market_summary),
+        (SELECT COUNT(*) FROM total_index),
+        (SELECT COUNT(*) FROM total_stocks),
+        (SELECT MAX(updated_at) FROM market_index),
+        (SELECT MAX(updated_at) FROM market_stocks),
+        (SELECT MAX(updated_at) FROM market_summary),
+        (SELECT MAX(updated_at) FROM total_index),
+        (SELECT MAX(updated_at) FROM total_stocks)
+"""
+
 # Function to check database connection and data availability
 def check_database():
     try:
-        # Try to connect to PostgreSQL
-        conn = psycopg2.connect(
-            host=PG_HOST,
-            port=PG_PORT,
-            database=PG_DATABASE,
-            user=PG_USER,
-            password=PG_PASSWORD
-        )
-        cursor = conn.cursor()
-        
-        # Check if tables exist and have data
-        cursor.execute("SELECT COUNT(*) FROM market_index")
-        index_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM market_stocks")
-        stocks_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM market_summary")
-        summary_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM total_index")
-        total_index_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM total_stocks")
-        total_stocks_count = cursor.fetchone()[0]
-        
-        # Get last update timestamp
-        cursor.execute("SELECT MAX(updated_at) FROM market_index")
-        last_updated = cursor.fetchone()[0]
-        
-        cursor.close()
-        conn.close()
+        # Borrow a connection from the shared pool instead of opening a new one
+        with get_engine().connect() as conn:
+            # Check if tables exist and have data, and get the last update
+            # timestamp; the other tables' last updates are not shown
+            (
+                index_count,
+                stocks_count,
+                summary_count,
+                total_index_count,
+                total_stocks_count,
+                last_updated
+            ) = conn.exec_driver_sql(TABLE_STATS_QUERY).one()[:6]
         
         st.session_state.db_connected = True
         st.session_state.data_last_refreshed = last_updated
@@ -139,67 +155,252 @@ def refresh_data():
         st.info("Generating data and updating database... This may take a few minutes.")
         progress_bar = st.progress(0)
         
-        # Pass database credentials to the generate_data.py script via environment variables
-        env = {
-            "PG_HOST": PG_HOST,
-            "PG_PORT": PG_PORT,
-            "PG_DATABASE": PG_DATABASE,
-            "PG_USER": PG_USER,
-            "PG_PASSWORD": PG_PASSWORD
-        }
+        # Pass database credentials to the generate_data.py script via environment
+        # variables on top of the inherited environment (PATH etc.)
+        env = dict(
+            os.environ,
+            PG_HOST=str(PG_HOST),
+            PG_PORT=str(PG_PORT),
+            PG_DATABASE=str(PG_DATABASE),
+            PG_USER=str(PG_USER),
+            PG_PASSWORD=str(PG_PASSWORD),
+            PYTHONUNBUFFERED="1"
+        )
         
-        # Run the data generation script
+        # Run the data generation script, with stderr folded into stdout so a
+        # single pipe is read and neither can fill up and stall the script
         process = subprocess.Popen(
-            ["python", "generate_data.py"], 
+            [sys.executable, "generate_data.py"], 
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=1,
             text=True,
             env=env
         )
         
-        # Show progress updates
-        while True:
-            progress_bar.progress(min(0.9, progress_bar.progress + 0.1))
-            time.sleep(2)
-            
-            # Check if process is still running
-            if process.poll() is not None:
-                break
+        # Show progress as the script reports it: "progress:<fraction>" lines
+        # set the bar, any other output nudges it along. Only the last 20 lines
+        # of output are kept for the error message
+        output = deque(maxlen=20)
+        progress = 0.0
+        for line in iter(process.stdout.readline, ""):
+            line = line.rstrip()
+            if line.startswith("progress:"):
+                try:
+                    progress = min(0.9, float(line.split(":", 1)[1]))
+                except ValueError:
+                    pass
+            else:
+                output.append(line)
+                progress = min(0.9, progress + 0.1)
+            progress_bar.progress(progress)
         
-        stdout, stderr = process.communicate()
+        process.stdout.close()
+        process.wait()
         
         if process.returncode == 0:
             progress_bar.progress(1.0)
             st.success("Data updated successfully!")
             return True
         else:
-            st.error(f"Error generating data: {stderr}")
+            # The last lines of output carry the traceback if the script failed
+            error_output = "\n".join(output)
+            st.error(f"Error generating data: {error_output}")
             return False
     except Exception as e:
         st.error(f"Error: {str(e)}")
         return False
 
+# Directory for the on-disk Arrow snapshots of the loaded tables, private to
+# the user running the app
+SNAPSHOT_DIR = os.path.join(
+    tempfile.gettempdir(),
+    f"hb_dashboard-{os.getuid()}" if hasattr(os, "getuid") else "hb_dashboard"
+)
+
+# Bump when the way the tables are prepared changes, so older snapshots are ignored
+SNAPSHOT_FORMAT = 3
+
+# Longest time a snapshot is reused, in seconds, in case the data changed in a
+# way the table stats do not show
+SNAPSHOT_MAX_AGE = 60 * 60
+
+# Function to get the snapshot directory, creating it readable only by this
+# user; returns None if it exists but belongs to someone else or is shared
+def get_snapshot_dir():
+    try:
+        os.mkdir(SNAPSHOT_DIR, 0o700)
+    except FileExistsError:
+        pass
+    except OSError:
+        return None
+    
+    if os.name == "posix":
+        dir_stat = os.lstat(SNAPSHOT_DIR)
+        if (
+            not stat.S_ISDIR(dir_stat.st_mode)
+            or dir_stat.st_uid != os.getuid()
+            or dir_stat.st_mode & 0o077
+        ):
+            return None
+    return SNAPSHOT_DIR
+
+# Function to get the snapshot path for the current database contents, as
+# identified by the table stats (the counts also change on deletes) and the
+# current SNAPSHOT_MAX_AGE period; returns None when snapshots cannot be used,
+# so the tables are loaded directly
+def get_snapshot_path(engine):
+    snapshot_dir = get_snapshot_dir()
+    if snapshot_dir is None:
+        return None
+    
+    try:
+        with engine.connect() as conn:
+            version = tuple(conn.exec_driver_sql(TABLE_STATS_QUERY).one())
+    except Exception:
+        # The snapshot is only a speed-up; a failing check must not stop the load
+        return None
+    
+    # Snapshots from an earlier period are removed when the next one is written
+    period = int(datetime.now().timestamp()) // SNAPSHOT_MAX_AGE
+    version = f"v{SNAPSHOT_FORMAT} {PG_HOST}:{PG_PORT}/{PG_DATABASE} {period} {version}"
+    return os.path.join(snapshot_dir, hashlib.sha256(version.encode()).hexdigest())
+
+# Function to read the snapshot back if one was written for the current data
+def read_snapshot(snapshot_path):
+    if snapshot_path is None:
+        return None
+    
+    try:
+        # The files are written uncompressed so they can be memory-mapped
+        # instead of decoded
+        return {
+            sheet_name: pa_feather.read_table(
+                os.path.join(snapshot_path, f"{sheet_name}.feather"), memory_map=True
+            ).to_pandas()
+            for sheet_name in ["INDEX", "STOCKS", "SUMMARY", "Total_Index", "Total_Stocks"]
+        }
+    except (OSError, pa.ArrowException):
+        return None
+
+# Function to write the loaded tables as the snapshot for the current data
+def write_snapshot(data, snapshot_path):
+    if snapshot_path is None or os.path.isdir(snapshot_path):
+        return
+    
+    snapshot_dir = os.path.dirname(snapshot_path)
+    try:
+        # Write into a new staging directory and rename it into place once it
+        # is complete, so neither readers nor other writers see a partial snapshot
+        staging_path = tempfile.mkdtemp(prefix=".staging-", dir=snapshot_dir)
+        try:
+            for sheet_name, df in data.items():
+                pa_feather.write_feather(
+                    df, os.path.join(staging_path, f"{sheet_name}.feather"), compression="uncompressed"
+                )
+            os.rename(staging_path, snapshot_path)
+        except BaseException:
+            shutil.rmtree(staging_path, ignore_errors=True)
+            raise
+        
+        # Remove snapshots of older data, leaving other writers' staging directories alone
+        for name in os.listdir(snapshot_dir):
+            path = os.path.join(snapshot_dir, name)
+            if path != snapshot_path and not name.startswith(".staging-"):
+                shutil.rmtree(path, ignore_errors=True)
+    except (OSError, pa.ArrowException):
+        # The snapshot is only a speed-up; the data was loaded either way
+        pass
+
+# Arrow types for the PostgreSQL column types, matching the dtypes pd.read_sql
+# gave; columns of any other type are read as text
+ARROW_COLUMN_TYPES = {
+    "text": pa.string(),
+    "character varying": pa.string(),
+    "character": pa.string(),
+    "boolean": pa.bool_(),
+    "smallint": pa.int64(),
+    "integer": pa.int64(),
+    "bigint": pa.int64(),
+    "real": pa.float64(),
+    "double precision": pa.float64(),
+    "numeric": pa.float64(),
+    "date": pa.timestamp("ns"),
+    "timestamp without time zone": pa.timestamp("ns"),
+    "timestamp with time zone": pa.timestamp("ns", tz="UTC"),
+}
+
 # Function to load data from PostgreSQL
-@st.cache_data(ttl=600)  # Cache data for 10 minutes
+# Cached as a resource: every session and rerun gets these same frames rather
+# than its own copy, so memory does not grow with the number of users. The
+# returned dataframes, and everything the cached helpers below derive from
+# them, are shared and must be treated as read-only: copy before modifying.
+# Also returns a token that is new for every load; caches derived from the
+# frames take it as a key so they never serve slices of an earlier load
+@st.cache_resource(ttl=600)  # Cache data for 10 minutes
 def load_data():
     try:
-        engine = create_engine(pg_connection_string)
+        engine = get_engine()
         
-        # Load each table into a separate dataframe
-        df_index = pd.read_sql("SELECT * FROM market_index", engine)
-        df_stocks = pd.read_sql("SELECT * FROM market_stocks", engine)
-        df_summary = pd.read_sql("SELECT * FROM market_summary", engine)
-        df_total_index = pd.read_sql("SELECT * FROM total_index", engine)
-        df_total_stocks = pd.read_sql("SELECT * FROM total_stocks", engine)
+        # Reuse the disk snapshot when the tables have not changed since it was written
+        snapshot_path = get_snapshot_path(engine)
+        data = read_snapshot(snapshot_path)
+        if data is not None:
+            return data, uuid.uuid4().hex
         
-        # Convert date columns to datetime
-        date_columns = ['date']
-        for df in [df_index, df_stocks, df_summary, df_total_index, df_total_stocks]:
-            for col in date_columns:
-                if col in df.columns:
-                    df[col] = pd.to_datetime(df[col])
+        # Load each table into a separate dataframe, reading all five at once on
+        # their own pooled connections; the driver releases the GIL while it
+        # waits on the network
+        def read_table(table_name):
+            # Stream the table out with COPY and parse it with Arrow's C++ CSV
+            # reader instead of building a Python object for every cell
+            buffer = io.BytesIO()
+            conn = engine.raw_connection()
+            try:
+                with conn.cursor() as cursor:
+                    # Take each column's type from the table definition rather
+                    # than letting Arrow guess it from the CSV text
+                    cursor.execute(
+                        "SELECT column_name, data_type FROM information_schema.columns "
+                        "WHERE table_schema = current_schema() AND table_name = %s",
+                        (table_name,)
+                    )
+                    column_types = {
+                        column_name: ARROW_COLUMN_TYPES.get(data_type, pa.string())
+                        for column_name, data_type in cursor.fetchall()
+                    }
+                    cursor.copy_expert(f"COPY {table_name} TO STDOUT WITH (FORMAT CSV, HEADER)", buffer)
+            finally:
+                conn.close()
+            buffer.seek(0)
+            
+            # COPY writes SQL NULL as an unquoted empty field and an empty string
+            # as a quoted one, so only the former is read as a missing value.
+            # Text values may contain quoted line breaks. The whole table is
+            # parsed as one block, since Arrow can drop the \n of a quoted \r\n
+            # that falls on a block boundary; the five tables are still parsed
+            # in parallel
+            return pa_csv.read_csv(
+                buffer,
+                read_options=pa_csv.ReadOptions(block_size=buffer.getbuffer().nbytes + 1),
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types=column_types,
+                    null_values=[""],
+                    true_values=["t"],
+                    false_values=["f"],
+                    strings_can_be_null=True,
+                    quoted_strings_can_be_null=False
+                )
+            ).to_pandas()
+        
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            df_index, df_stocks, df_summary, df_total_index, df_total_stocks = executor.map(
+                read_table, ["market_index", "market_stocks", "market_summary", "total_index", "total_stocks"]
+            )
         
-        # Make the column names consistent with the Excel-based version
+        # Make the column names consistent with the Excel-based version; the
+        # renamed frames share the freshly read column data instead of copying it
         df_index = df_index.rename(columns={
             'date': 'Date',
             'symbol': 'Symbol',
@@ -212,7 +413,7 @@ def load_data():
             'total_sell_clients': 'TotalSellClients',
             'buy_percent': 'BuyPercent',
             'sell_percent': 'SellPercent'
-        })
+        }, copy=False)
         
         df_stocks = df_stocks.rename(columns={
             'date': 'Date',
@@ -228,14 +429,14 @@ def load_data():
             'sell_percent': 'SellPercent',
             'market_cap': 'MarketCap',
             'market_cap_percentage': 'MarketCap_Percentage'
-        })
+        }, copy=False)
         
         df_summary = df_summary.rename(columns={
             'date': 'Date',
             'instrument': 'Instrument',
             'net_qty_carry_fwd': 'NetQtyCarryFwd',
             'net_value_in_cr': 'NetValue_in_Cr'
-        })
+        }, copy=False)
         
         df_total_index = df_total_index.rename(columns={
             'date': 'Date',
@@ -244,7 +445,7 @@ def load_data():
             'net_qty_carry_fwd': 'NetQtyCarryFwd',
             'net_value_in_cr': 'NetValue_in_Cr',
             'nsei_close': 'NSEI_Close'
-        })
+        }, copy=False)
         
         df_total_stocks = df_total_stocks.rename(columns={
             'date': 'Date',
@@ -253,7 +454,13 @@ def load_data():
             'net_qty_carry_fwd': 'NetQtyCarryFwd',
             'net_value_in_cr': 'NetValue_in_Cr',
             'nsei_close': 'NSEI_Close'
-        })
+        }, copy=False)
+        
+        # Store the repeated symbol, instrument and weekday names as categoricals
+        for df in [df_index, df_stocks, df_summary, df_total_index, df_total_stocks]:
+            for col in ['Symbol', 'Instrument', 'Day']:
+                if col in df.columns:
+                    df[col] = df[col].astype('category')
         
         # Multiply MarketCap_Percentage by 100 if the column exists
         if 'MarketCap_Percentage' in df_stocks.columns:
@@ -298,16 +505,217 @@ def load_data():
             df_total_index = pd.merge(df_total_index, index_daily_sums, on='Date', how='left')
 
 
-        return {
-            "INDEX": df_index,
-            "STOCKS": df_stocks,
-            "SUMMARY": df_summary,
-            "Total_Index": df_total_index,
-            "Total_Stocks": df_total_stocks
+        # Keep every table in date order so date ranges can be found by binary search
+        data = {
+            sheet_name: df.sort_values("Date", kind="stable", ignore_index=True)
+            for sheet_name, df in {
+                "INDEX": df_index,
+                "STOCKS": df_stocks,
+                "SUMMARY": df_summary,
+                "Total_Index": df_total_index,
+                "Total_Stocks": df_total_stocks
+            }.items()
         }
+        write_snapshot(data, snapshot_path)
+        return data, uuid.uuid4().hex
     except Exception as e:
         st.error(f"Error loading data from PostgreSQL: {e}")
-        return None
+        return None, None
+
+# Function to get the overall date range of the loaded data; the frames are
+# sorted by Date, so each one's bounds are its first and last valid dates
+@st.cache_resource(ttl=600)  # Bounds only change when the data does
+def load_date_bounds(_data, data_version):
+    date_columns = [df["Date"] for df in _data.values() if "Date" in df.columns]
+    date_columns = [col for col in date_columns if col.last_valid_index() is not None]
+    return (
+        min(col.iat[0] for col in date_columns),
+        max(col.loc[col.last_valid_index()] for col in date_columns),
+    )
+
+# Function to restrict a dataframe to the selected date range
+def filter_by_date(df, start_date, end_date):
+    if "Date" in df.columns:
+        # Tables are sorted by Date at load time, so the range is one contiguous slice.
+        # The bounds stay datetime64: everything from the start of start_date up to,
+        # but not including, the day after end_date
+        dates = df["Date"]
+        start = dates.searchsorted(pd.Timestamp(start_date))
+        end = dates.searchsorted(pd.Timestamp(end_date) + pd.Timedelta(days=1))
+        return df.iloc[start:end]
+    return df
+
+# Function to get the row positions of each symbol in a date-filtered table;
+# position arrays are cached rather than per-symbol copies of the rows
+# (_data is not hashed; data_version identifies which load it came from)
+@st.cache_resource(ttl=600, max_entries=10)
+def load_symbol_groups(_data, data_version, sheet_name, start_date, end_date):
+    df = filter_by_date(_data[sheet_name], start_date, end_date)
+    return df.groupby("Symbol", observed=True).indices
+
+# Function to get the latest date of each table within the selected range
+@st.cache_resource(ttl=600, max_entries=10)
+def load_latest_dates(_data, data_version, start_date, end_date):
+    return {
+        sheet_name: filter_by_date(df, start_date, end_date)["Date"].max()
+        for sheet_name, df in _data.items() if "Date" in df.columns
+    }
+
+# Font sizes shared by every chart, matching the page's 20px text
+FONT_LAYOUT = dict(
+    title_font=dict(size=20),
+    legend_font=dict(size=20),
+    xaxis_title_font=dict(size=20),
+    yaxis_title_font=dict(size=20),
+    xaxis_tickfont=dict(size=20),
+    yaxis_tickfont=dict(size=20)
+)
+
+# Plotly config for view-only charts: no hover layer, drag handlers or modebar
+STATIC_CHART_CONFIG = {"staticPlot": True, "displayModeBar": False}
+
+# Maximum number of points sent to the browser per line trace
+MAX_PLOT_POINTS = 2000
+
+# Traces with more points than this are drawn with WebGL instead of SVG,
+# the same cut-off Plotly Express uses for render_mode="auto"
+WEBGL_MIN_POINTS = 1000
+
+# Function to pick the points of a series to plot with Largest-Triangle-Three-Buckets
+def lttb_indices(x, y, n_out):
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # Points 1..n-2 are split into n_out - 2 buckets; first and last are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    selected = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i < n_out - 3 else (n - 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # Keep the point forming the largest triangle with the previous pick and the next bucket's average
+        area = np.abs(
+            (x[selected] - avg_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (avg_y - y[selected])
+        )
+        selected = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        indices[i + 1] = selected
+    return indices
+
+# Function to downsample a time series frame before handing it to Plotly;
+# pass by= for charts with one line per group so each line keeps n_out points
+def downsample(df, y, x="Date", n_out=MAX_PLOT_POINTS, by=None):
+    if len(df) <= n_out:
+        return df
+    if by is not None:
+        # sort=False keeps the groups in order of first appearance, so Plotly
+        # assigns the same colours as it would to the full frame
+        return pd.concat([
+            downsample(group, y, x, n_out)
+            for _, group in df.groupby(by, sort=False, observed=True)
+        ])
+    if not df[x].is_monotonic_increasing:
+        df = df.sort_values(x)
+    x_values = df[x].to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+    y_values = df[y].to_numpy(dtype=np.float64)
+    return df.iloc[lttb_indices(x_values, y_values, n_out)]
+
+# Function to summarise a long series as min/max/mean per time bucket, for drawing
+# a range band with a mean line instead of every point
+def aggregate_for_plot(df, y, x="Date", buckets=MAX_PLOT_POINTS // 2):
+    x_values = df[x].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    bucket = pd.cut(x_values, bins=buckets, labels=False)
+    grouped = pd.DataFrame({x: x_values, y: df[y].to_numpy()}).groupby(bucket)
+    bands = grouped[y].agg(["min", "max", "mean"])
+    # Place each bucket at the average time of the points in it
+    bands[x] = pd.to_datetime(grouped[x].mean().to_numpy(dtype=np.int64))
+    return bands.reset_index(drop=True)
+
+# Columns to hide by default for each table in the Raw Data tab
+COLUMNS_TO_HIDE = {
+    "INDEX": ["id", "created_at", "updated_at", "BtFrwdLongQty", "BtFrwdShortQty"],
+    "STOCKS": ["id", "created_at", "updated_at", "BtFrwdLongQty", "BtFrwdShortQty"],
+    "SUMMARY": ["id", "created_at", "updated_at"],
+    "Total_Index": ["id", "created_at", "updated_at"],
+    "Total_Stocks": ["id", "created_at", "updated_at"]
+}
+
+# Function to list the columns shown for a table in the Raw Data tab
+# (a tuple, since the cached value is shared)
+@st.cache_resource(ttl=600, show_spinner=False)
+def load_visible_columns(_data, data_version, sheet_name, show_all_columns):
+    columns = tuple(_data[sheet_name].columns)
+    if show_all_columns:
+        return columns
+    hidden_columns = COLUMNS_TO_HIDE.get(sheet_name, [])
+    return tuple(col for col in columns if col not in hidden_columns)
+
+# Function to convert a column to the Arrow values that the CSV writer turns
+# into the same text DataFrame.to_csv wrote for it
+def to_csv_column(series, column):
+    if pa.types.is_boolean(column.type):
+        # Arrow would write true/false
+        return pa_compute.if_else(column, "True", "False")
+    
+    if pa.types.is_floating(column.type):
+        # pandas writes floats as NumPy's shortest repr (1e-05, 100.0), which
+        # Arrow's number formatting does not follow
+        values = series.to_numpy()
+        return pa.array(values.astype(str), mask=np.isnan(values))
+    
+    if pa.types.is_timestamp(column.type):
+        dates = series.dropna()
+        if column.type.tz is None and dates.equals(dates.dt.normalize()):
+            # Only the date when every value is at midnight
+            return column.cast(pa.date32())
+        
+        # As many fractional digits as the data needs
+        if (dates.dt.nanosecond != 0).any():
+            unit = "ns"
+        elif (dates.dt.microsecond != 0).any():
+            unit = "us"
+        else:
+            unit = "s"
+        column = column.cast(pa.timestamp(unit, tz=column.type.tz))
+        if column.type.tz is None:
+            return column
+        
+        # Timezone-aware values only get a fraction where they have one, and the
+        # offset is written as +00:00 where Arrow would write Z
+        whole_seconds = pa.array(((series.dt.microsecond == 0) & (series.dt.nanosecond == 0)).to_numpy())
+        return pa_compute.if_else(
+            whole_seconds,
+            pa_compute.strftime(
+                column.cast(pa.timestamp("s", tz=column.type.tz), safe=False), format="%Y-%m-%d %H:%M:%S%Ez"
+            ),
+            pa_compute.strftime(column, format="%Y-%m-%d %H:%M:%S%Ez")
+        )
+    
+    return column
+
+# Function to encode a full table as CSV bytes for download, using Arrow's
+# C++ CSV writer rather than pandas' row-by-row formatter, with the same
+# text as the DataFrame.to_csv output it replaced
+@st.cache_resource(ttl=600, show_spinner=False)
+def load_csv_bytes(_data, data_version, sheet_name):
+    df = _data[sheet_name]
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, name in enumerate(table.column_names):
+        table = table.set_column(i, name, to_csv_column(df[name], table.column(i)))
+    
+    # Arrow quotes the header and every string value, where to_csv only quoted
+    # values that needed it. The header comes from pandas and the values are
+    # written unquoted; Arrow refuses that if a value contains a comma, quote or
+    # line break, and pandas then writes the table
+    buffer = pa.BufferOutputStream()
+    try:
+        pa_csv.write_csv(table, buffer, pa_csv.WriteOptions(include_header=False, quoting_style="none"))
+    except pa.ArrowInvalid:
+        return df.to_csv(index=False).encode()
+    return df.iloc[:0].to_csv(index=False).encode() + buffer.getvalue().to_pybytes()
 
 # Sidebar for data operations and filtering
 st.sidebar.header("Data Controls")
@@ -321,14 +729,15 @@ if connection_status:
 
     # Show data statistics
     if isinstance(connection_info, dict):
-        counts_html = f"""
-        <table style='width:100%; font-size:20px; text-align:left;'>
-        <tr><td><b>Index records:</b></td><td>{connection_info['index']}</td></tr>
-        <tr><td><b>Stocks records:</b></td><td>{connection_info['stocks']}</td></tr>
-        <tr><td><b>Summary records:</b></td><td>{connection_info['summary']}</td></tr>
-        </table>
-        """
-        st.sidebar.markdown(counts_html, unsafe_allow_html=True)
+        # A native table rather than raw HTML; the page CSS sizes .stTable text
+        st.sidebar.table(pd.DataFrame(
+            [
+                ["Index", connection_info['index']],
+                ["Stocks", connection_info['stocks']],
+                ["Summary", connection_info['summary']]
+            ],
+            columns=["Table", "Records"]
+        ).set_index("Table"))
         
         if connection_info['last_updated']:
             st.sidebar.info(f"Last updated: {connection_info['last_updated'].strftime('%Y-%m-%d %H:%M:%S')}")
@@ -338,6 +747,15 @@ if connection_status:
         if success:
             # Clear cache to force reload
             load_data.clear()
+            # Entries derived from the old frames are already keyed out by the new
+            # load's token; clearing them just frees that memory straight away
+            load_date_bounds.clear()
+            load_symbol_groups.clear()
+            load_latest_dates.clear()
+            load_visible_columns.clear()
+            load_csv_bytes.clear()
+            # Drop this session's filtered frames so they are not held alongside the new data
+            st.session_state.pop("filtered_data", None)
             # Check connection again to refresh stats
             connection_status, connection_info = check_database()
 else:
@@ -352,13 +770,12 @@ else:
 # Only proceed if database is connected
 if connection_status:
     # Load data from PostgreSQL
-    data = load_data()
+    data, data_version = load_data()
     
     if data:
         # Get min and max dates from the data
         try:
-            min_date = min(df["Date"].min() for df in data.values() if "Date" in df.columns)
-            max_date = max(df["Date"].max() for df in data.values() if "Date" in df.columns)
+            min_date, max_date = load_date_bounds(data, data_version)
         except Exception as e:
             st.error(f"Error calculating date range: {e}")
             min_date = datetime.now()
@@ -371,15 +788,25 @@ if connection_status:
         start_date = st.sidebar.date_input("Start Date", min_date)
         end_date = st.sidebar.date_input("End Date", max_date)
 
-        # Apply date filtering to all dataframes
-        def filter_by_date(df):
-            if "Date" in df.columns:
-                return df[(df["Date"].dt.date >= start_date) & (df["Date"].dt.date <= end_date)]
-            return df
-
-        filtered_data = {
-            key: filter_by_date(df) for key, df in data.items()
-        }
+        # Apply date filtering to all dataframes, reusing this session's filtered
+        # frames when neither the date range nor the loaded data changed since the
+        # last rerun (e.g. only a tab or another widget was touched). The load's
+        # token identifies the data, so the session never holds on to old frames
+        filter_key = (data_version, start_date, end_date)
+        if "filtered_data" in st.session_state and st.session_state.filter_key == filter_key:
+            filtered_data = st.session_state.filtered_data
+        else:
+            # Drop the previous entry first so two sets of frames are never held at once
+            st.session_state.pop("filtered_data", None)
+            # Tables without a Date column are passed through by reference
+            date_keys = [key for key, df in data.items() if "Date" in df.columns]
+            filtered_data = {
+                **data,
+                **{key: filter_by_date(data[key], start_date, end_date) for key in date_keys}
+            }
+            st.session_state.filter_key = filter_key
+            st.session_state.filtered_data = filtered_data
+        latest_dates = load_latest_dates(data, data_version, start_date, end_date)
 
         # Create tabs for different views
         tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs(["Overview", "INDEX", "STOCKS", "Total Index", "Total Stocks", "Percentage Change", "Percentage Change (NetQtyFwd)", "Raw Data"])
@@ -393,35 +820,37 @@ if connection_status:
             with col1:
                 # Summary metrics for indices
                 try:
-                    latest_date = filtered_data["Total_Index"]["Date"].max()
-                    latest_index_data = filtered_data["Total_Index"][filtered_data["Total_Index"]["Date"] == latest_date]
+                    # Tables are sorted by Date, so the latest date is the last one and
+                    # a binary search finds the first row carrying it
+                    index_dates = filtered_data["Total_Index"]["Date"]
+                    if not index_dates.empty:
+                        latest_date = index_dates.iat[-1]
+                        latest_pos = index_dates.searchsorted(latest_date)
+                        latest_index_data = filtered_data["Total_Index"].iloc[[latest_pos]]
+                    else:
+                        latest_date = pd.NaT
+                        latest_index_data = filtered_data["Total_Index"]
                     
                     if not latest_index_data.empty:
                         st.metric(
                             label="Latest Index Net Value (Cr)",
-                            value=f"₹{latest_index_data['NetValue_in_Cr'].values[0]:,.2f} Cr"
+                            value=f"₹{latest_index_data['NetValue_in_Cr'].iat[0]:,.2f} Cr"
                         )
                     else:
                         st.warning("No index data available for the selected date range.")
                         
                     # Plot the trend of index net value
                     fig = px.line(
-                        filtered_data["Total_Index"],
+                        downsample(filtered_data["Total_Index"], "NetValue_in_Cr"),
                         x="Date",
                         y="NetValue_in_Cr",
+                        render_mode="webgl",
                         title="Index Net Value Trend (Cr)",
                         labels={"NetValue_in_Cr": "Net Value (Cr)", "Date": "Date"}
                     )
                     
                     # Update chart font size
-                    fig.update_layout(
-                        title_font=dict(size=20),
-                        legend_font=dict(size=20),
-                        xaxis_title_font=dict(size=20),
-                        yaxis_title_font=dict(size=20),
-                        xaxis_tickfont=dict(size=20),
-                        yaxis_tickfont=dict(size=20)
-                    )
+                    fig.update_layout(**FONT_LAYOUT)
                     
                     st.plotly_chart(fig, use_container_width=True)
                 except Exception as e:
@@ -431,34 +860,32 @@ if connection_status:
                 # Summary metrics for stocks
                 try:
                     if not filtered_data["Total_Stocks"].empty:
-                        latest_stock_data = filtered_data["Total_Stocks"][filtered_data["Total_Stocks"]["Date"] == latest_date]
+                        # Slice out the rows for the latest index date by binary search
+                        stock_dates = filtered_data["Total_Stocks"]["Date"]
+                        latest_stock_data = filtered_data["Total_Stocks"].iloc[
+                            stock_dates.searchsorted(latest_date):stock_dates.searchsorted(latest_date, side="right")
+                        ]
                         
                         if not latest_stock_data.empty:
                             st.metric(
                                 label="Latest Stocks Net Value (Cr)",
-                                value=f"₹{latest_stock_data['NetValue_in_Cr'].values[0]:,.2f} Cr"
+                                value=f"₹{latest_stock_data['NetValue_in_Cr'].iat[0]:,.2f} Cr"
                             )
                         else:
                             st.warning("No stock data available for the selected date.")
                         
                         # Plot the trend of stocks net value
                         fig = px.line(
-                            filtered_data["Total_Stocks"],
+                            downsample(filtered_data["Total_Stocks"], "NetValue_in_Cr"),
                             x="Date",
                             y="NetValue_in_Cr",
+                            render_mode="webgl",
                             title="Stocks Net Value Trend (Cr)",
                             labels={"NetValue_in_Cr": "Net Value (Cr)", "Date": "Date"}
                         )
                         
                         # Update chart font size
-                        fig.update_layout(
-                            title_font=dict(size=20),
-                            legend_font=dict(size=20),
-                            xaxis_title_font=dict(size=20),
-                            yaxis_title_font=dict(size=20),
-                            xaxis_tickfont=dict(size=20),
-                            yaxis_tickfont=dict(size=20)
-                        )
+                        fig.update_layout(**FONT_LAYOUT)
                         
                         st.plotly_chart(fig, use_container_width=True)
                     else:
@@ -468,27 +895,20 @@ if connection_status:
             
             # Combined chart showing both index and stock trends
             try:
-                summary_df = filtered_data["SUMMARY"].copy()
+                summary_df = filtered_data["SUMMARY"]
                 if not summary_df.empty:
                     fig = px.line(
-                        summary_df,
+                        downsample(summary_df, "NetValue_in_Cr", by="Instrument"),
                         x="Date",
                         y="NetValue_in_Cr",
                         color="Instrument",
+                        render_mode="webgl",
                         title="Comparison of Index vs Stocks Net Value",
                         labels={"NetValue_in_Cr": "Net Value (Cr)", "Date": "Date", "Instrument": "Category"}
                     )
                     
                     # Update chart font size
-                    fig.update_layout(
-                        title_font=dict(size=20),
-                        legend_font=dict(size=20),
-                        xaxis_title_font=dict(size=20),
-                        yaxis_title_font=dict(size=20),
-                        xaxis_tickfont=dict(size=20),
-                        yaxis_tickfont=dict(size=20),
-                        legend=dict(font=dict(size=20))
-                    )
+                    fig.update_layout(**FONT_LAYOUT)
                     
                     st.plotly_chart(fig, use_container_width=True)
                 else:
@@ -499,13 +919,19 @@ if connection_status:
         with tab2:
             st.header("INDEX Details")
             
-            # Filter options
-            index_symbols = sorted(filtered_data["INDEX"]["Symbol"].unique()) if not filtered_data["INDEX"].empty else []
+            # Filter options, read from the cached per-symbol positions (already in
+            # sorted category order) rather than re-deriving uniques each rerun
+            index_groups = load_symbol_groups(data, data_version, "INDEX", start_date, end_date)
+            index_symbols = list(index_groups)
             default_indices = index_symbols[:3] if len(index_symbols) >= 3 else index_symbols
             selected_indices = st.multiselect("Select Indices", index_symbols, default=default_indices)
             
             if selected_indices:
-                filtered_index_data = filtered_data["INDEX"][filtered_data["INDEX"]["Symbol"].isin(selected_indices)]
+                # Take the selected symbols' rows by their cached positions instead of scanning
+                # the Symbol column; sorting the positions keeps the table's row order
+                filtered_index_data = filtered_data["INDEX"].take(
+                    np.sort(np.concatenate([index_groups[symbol] for symbol in selected_indices]))
+                )
                 
                 # Show the data table
                 st.subheader("Index Data Table")
@@ -517,7 +943,7 @@ if connection_status:
                 # Net value by symbol
                 try:
                     fig = px.bar(
-                        filtered_index_data.groupby("Symbol")["NetValue_in_Cr"].sum().reset_index(),
+                        filtered_index_data.groupby("Symbol", observed=True)["NetValue_in_Cr"].sum().reset_index(),
                         x="Symbol",
                         y="NetValue_in_Cr",
                         title="Net Value by Index (Cr)",
@@ -525,14 +951,7 @@ if connection_status:
                     )
                     
                     # Update chart font size
-                    fig.update_layout(
-                        title_font=dict(size=20),
-                        legend_font=dict(size=20),
-                        xaxis_title_font=dict(size=20),
-                        yaxis_title_font=dict(size=20),
-                        xaxis_tickfont=dict(size=20),
-                        yaxis_tickfont=dict(size=20)
-                    )
+                    fig.update_layout(**FONT_LAYOUT)
                     
                     st.plotly_chart(fig, use_container_width=True)
                 except Exception as e:
@@ -541,7 +960,7 @@ if connection_status:
                 # Buy vs Sell Percentages
                 try:
                     if "BuyPercent" in filtered_index_data.columns and "SellPercent" in filtered_index_data.columns:
-                        buy_sell_data = filtered_index_data.groupby("Symbol")[["BuyPercent", "SellPercent"]].mean().reset_index()
+                        buy_sell_data = filtered_index_data.groupby("Symbol", observed=True)[["BuyPercent", "SellPercent"]].mean().reset_index()
                         
                         fig = go.Figure()
                         fig.add_trace(go.Bar(x=buy_sell_data["Symbol"], y=buy_sell_data["BuyPercent"], name="Buy %", marker_color="green"))
@@ -553,12 +972,7 @@ if connection_status:
                             yaxis_title="Percentage",
                             barmode="group",
                             legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                            title_font=dict(size=20),
-                            legend_font=dict(size=20),
-                            xaxis_title_font=dict(size=20),
-                            yaxis_title_font=dict(size=20),
-                            xaxis_tickfont=dict(size=20),
-                            yaxis_tickfont=dict(size=20)
+                            **FONT_LAYOUT
                         )
                         st.plotly_chart(fig, use_container_width=True)
                 except Exception as e:
@@ -567,7 +981,7 @@ if connection_status:
                 # Market Cap Percentage (if available for INDEX)
                 try:
                     if "MarketCap_Percentage" in filtered_index_data.columns:
-                        market_cap_data = filtered_index_data.groupby("Symbol")["MarketCap_Percentage"].mean().reset_index()
+                        market_cap_data = filtered_index_data.groupby("Symbol", observed=True)["MarketCap_Percentage"].mean().reset_index()
                         
                         fig = px.bar(
                             market_cap_data,
@@ -578,14 +992,7 @@ if connection_status:
                         )
                         
                         # Update chart font size
-                        fig.update_layout(
-                            title_font=dict(size=20),
-                            legend_font=dict(size=20),
-                            xaxis_title_font=dict(size=20),
-                            yaxis_title_font=dict(size=20),
-                            xaxis_tickfont=dict(size=20),
-                            yaxis_tickfont=dict(size=20)
-                        )
+                        fig.update_layout(**FONT_LAYOUT)
                         
                         st.plotly_chart(fig, use_container_width=True)
                 except Exception as e:
@@ -596,27 +1003,30 @@ if connection_status:
         with tab3:
             st.header("STOCKS Details")
             
-            # Filter options
-            stock_symbols = sorted(filtered_data["STOCKS"]["Symbol"].unique()) if not filtered_data["STOCKS"].empty else []
+            # Filter options, read from the cached per-symbol positions (already in
+            # sorted category order) rather than re-deriving uniques each rerun
+            stock_groups = load_symbol_groups(data, data_version, "STOCKS", start_date, end_date)
+            stock_symbols = list(stock_groups)
             default_stocks = stock_symbols[:3] if len(stock_symbols) >= 3 else stock_symbols
             selected_stocks = st.multiselect("Select Stocks", stock_symbols, default=default_stocks)
             
             if selected_stocks:
-                filtered_stock_data = filtered_data["STOCKS"][filtered_data["STOCKS"]["Symbol"].isin(selected_stocks)]
+                # Take the selected symbols' rows by their cached positions instead of scanning
+                # the Symbol column; sorting the positions keeps the table's row order
+                filtered_stock_data = filtered_data["STOCKS"].take(
+                    np.sort(np.concatenate([stock_groups[symbol] for symbol in selected_stocks]))
+                )
                 
                 # Calculate NetQtyFwd Average Values
                 # 1. For entire dataset
-                entire_dataset_avg = data["STOCKS"][data["STOCKS"]["Symbol"].isin(selected_stocks)].groupby("Symbol")["NetQtyCarryFwd"].mean().reset_index()
+                entire_dataset_avg = data["STOCKS"][data["STOCKS"]["Symbol"].isin(selected_stocks)].groupby("Symbol", observed=True)["NetQtyCarryFwd"].mean().reset_index()
                 entire_dataset_avg = entire_dataset_avg.rename(columns={"NetQtyCarryFwd": "NetQtyFwd_Avg_All"})
                 
                 # 2. For 3-month period
-                max_date = filtered_data["STOCKS"]["Date"].max()
+                max_date = latest_dates["STOCKS"]
                 three_months_ago = max_date - pd.Timedelta(days=90)
-                three_month_data = filtered_data["STOCKS"][
-                    (filtered_data["STOCKS"]["Date"] >= three_months_ago) & 
-                    (filtered_data["STOCKS"]["Symbol"].isin(selected_stocks))
-                ]
-                three_month_avg = three_month_data.groupby("Symbol")["NetQtyCarryFwd"].mean().reset_index()
+                three_month_data = filtered_stock_data[filtered_stock_data["Date"] >= three_months_ago]
+                three_month_avg = three_month_data.groupby("Symbol", observed=True)["NetQtyCarryFwd"].mean().reset_index()
                 three_month_avg = three_month_avg.rename(columns={"NetQtyCarryFwd": "NetQtyFwd_Avg_3Months"})
                 
                 # Merge averages with the filtered data
@@ -643,7 +1053,7 @@ if connection_status:
                 # Net value by symbol
                 try:
                     fig = px.bar(
-                        filtered_stock_data.groupby("Symbol")["NetValue_in_Cr"].sum().reset_index(),
+                        filtered_stock_data.groupby("Symbol", observed=True)["NetValue_in_Cr"].sum().reset_index(),
                         x="Symbol",
                         y="NetValue_in_Cr",
                         title="Net Value by Stock (Cr)",
@@ -651,14 +1061,7 @@ if connection_status:
                     )
                     
                     # Update chart font size
-                    fig.update_layout(
-                        title_font=dict(size=20),
-                        legend_font=dict(size=20),
-                        xaxis_title_font=dict(size=20),
-                        yaxis_title_font=dict(size=20),
-                        xaxis_tickfont=dict(size=20),
-                        yaxis_tickfont=dict(size=20)
-                    )
+                    fig.update_layout(**FONT_LAYOUT)
                     
                     st.plotly_chart(fig, use_container_width=True)
                 except Exception as e:
@@ -667,7 +1070,7 @@ if connection_status:
                 # Market Cap Percentage (if available)
                 try:
                     if "MarketCap_Percentage" in filtered_stock_data.columns:
-                        market_cap_data = filtered_stock_data.groupby("Symbol")["MarketCap_Percentage"].mean().reset_index()
+                        market_cap_data = filtered_stock_data.groupby("Symbol", observed=True)["MarketCap_Percentage"].mean().reset_index()
                         
                         fig = px.bar(
                             market_cap_data,
@@ -678,14 +1081,7 @@ if connection_status:
                         )
                         
                         # Update chart font size
-                        fig.update_layout(
-                            title_font=dict(size=20),
-                            legend_font=dict(size=20),
-                            xaxis_title_font=dict(size=20),
-                            yaxis_title_font=dict(size=20),
-                            xaxis_tickfont=dict(size=20),
-                            yaxis_tickfont=dict(size=20)
-                        )
+                        fig.update_layout(**FONT_LAYOUT)
                         
                         st.plotly_chart(fig, use_container_width=True)
                 except Exception as e:
@@ -694,7 +1090,7 @@ if connection_status:
                 # Buy vs Sell Percentages
                 try:
                     if "BuyPercent" in filtered_stock_data.columns and "SellPercent" in filtered_stock_data.columns:
-                        buy_sell_data = filtered_stock_data.groupby("Symbol")[["BuyPercent", "SellPercent"]].mean().reset_index()
+                        buy_sell_data = filtered_stock_data.groupby("Symbol", observed=True)[["BuyPercent", "SellPercent"]].mean().reset_index()
                         
                         fig = go.Figure()
                         fig.add_trace(go.Bar(x=buy_sell_data["Symbol"], y=buy_sell_data["BuyPercent"], name="Buy %", marker_color="green"))
@@ -706,12 +1102,7 @@ if connection_status:
                             yaxis_title="Percentage",
                             barmode="group",
                             legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                            title_font=dict(size=20),
-                            legend_font=dict(size=20),
-                            xaxis_title_font=dict(size=20),
-                            yaxis_title_font=dict(size=20),
-                            xaxis_tickfont=dict(size=20),
-                            yaxis_tickfont=dict(size=20)
+                            **FONT_LAYOUT
                         )
                         st.plotly_chart(fig, use_container_width=True)
                 except Exception as e:
@@ -722,7 +1113,7 @@ if connection_status:
         with tab4:
             st.header("Total Index Analysis")
             
-            total_index_df = filtered_data["Total_Index"].copy()
+            total_index_df = filtered_data["Total_Index"]
             
             # Display data table
             st.subheader("Total Index Data")
@@ -732,22 +1123,16 @@ if connection_status:
             try:
                 if not total_index_df.empty:
                     fig = px.line(
-                        total_index_df,
+                        downsample(total_index_df, "NetValue_in_Cr"),
                         x="Date",
                         y="NetValue_in_Cr",
+                        render_mode="webgl",
                         title="Index Net Value Over Time (Cr)",
                         labels={"NetValue_in_Cr": "Net Value (Cr)", "Date": "Date"}
                     )
                     
                     # Update chart font size
-                    fig.update_layout(
-                        title_font=dict(size=20),
-                        legend_font=dict(size=20),
-                        xaxis_title_font=dict(size=20),
-                        yaxis_title_font=dict(size=20),
-                        xaxis_tickfont=dict(size=20),
-                        yaxis_tickfont=dict(size=20)
-                    )
+                    fig.update_layout(**FONT_LAYOUT)
                     
                     st.plotly_chart(fig, use_container_width=True)
                 else:
@@ -760,59 +1145,61 @@ if connection_status:
                 if "NSEI_Close" in total_index_df.columns and not total_index_df.empty:
                     st.subheader("Index Net Value vs Nifty Performance")
                     
-                    # Create two y-axes chart
-                    fig = go.Figure()
+                    # Downsample each series on its own, as each gets its own axis
+                    net_value_points = downsample(total_index_df, "NetValue_in_Cr")
+                    nifty_points = downsample(total_index_df, "NSEI_Close")
+                    scatter = go.Scattergl if len(net_value_points) > WEBGL_MIN_POINTS else go.Scatter
                     
-                    # First trace for Net Value
-                    fig.add_trace(
-                        go.Scatter(
-                            x=total_index_df["Date"],
-                            y=total_index_df["NetValue_in_Cr"],
-                            name="Net Value (Cr)",
-                            line=dict(color="blue")
-                        )
-                    )
+                    # Pass plain NumPy arrays so Plotly serialises contiguous buffers
+                    # instead of converting each Timestamp in a Series
+                    net_value_x = net_value_points["Date"].to_numpy(dtype="datetime64[ms]")
+                    net_value_y = net_value_points["NetValue_in_Cr"].to_numpy(dtype=np.float64)
+                    nifty_x = nifty_points["Date"].to_numpy(dtype="datetime64[ms]")
+                    nifty_y = nifty_points["NSEI_Close"].to_numpy(dtype=np.float64)
                     
-                    # Second trace for Nifty close price
-                    fig.add_trace(
-                        go.Scatter(
-                            x=total_index_df["Date"],
-                            y=total_index_df["NSEI_Close"],
-                            name="Nifty Close",
-                            line=dict(color="red"),
-                            yaxis="y2"
+                    # Create two y-axes chart with both traces and the layout in one call
+                    fig = go.Figure(
+                        data=[
+                            # First trace for Net Value
+                            scatter(
+                                x=net_value_x,
+                                y=net_value_y,
+                                name="Net Value (Cr)",
+                                line=dict(color="blue")
+                            ),
+                            # Second trace for Nifty close price
+                            scatter(
+                                x=nifty_x,
+                                y=nifty_y,
+                                name="Nifty Close",
+                                line=dict(color="red"),
+                                yaxis="y2"
+                            )
+                        ],
+                        layout=dict(
+                            title="Net Value vs Nifty Performance",
+                            xaxis=dict(title="Date"),
+                            yaxis=dict(title="Net Value (Cr)"),
+                            yaxis2=dict(
+                                title=dict(text="Nifty Close", font=dict(color="red", size=20)),
+                                tickfont=dict(color="red", size=20),
+                                anchor="x",
+                                overlaying="y",
+                                side="right"
+                            ),
+                            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                            **FONT_LAYOUT
                         )
                     )
                     
-                    # Update layout for two y-axes
-                    fig.update_layout(
-                        title="Net Value vs Nifty Performance",
-                        xaxis=dict(title="Date"),
-                        yaxis=dict(title="Net Value (Cr)"),
-                        yaxis2=dict(
-                            title=dict(text="Nifty Close", font=dict(color="red", size=20)),
-                            tickfont=dict(color="red", size=20),
-                            anchor="x",
-                            overlaying="y",
-                            side="right"
-                        ),
-                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                        title_font=dict(size=20),
-                        legend_font=dict(size=20),
-                        xaxis_title_font=dict(size=20),
-                        yaxis_title_font=dict(size=20),
-                        xaxis_tickfont=dict(size=20),
-                        yaxis_tickfont=dict(size=20)
-                    )
-                    
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(fig, use_container_width=True, config=STATIC_CHART_CONFIG)
             except Exception as e:
                 st.error(f"Error displaying Nifty comparison chart: {e}")
 
         with tab5:
             st.header("Total Stocks Analysis")
             
-            total_stocks_df = filtered_data["Total_Stocks"].copy()
+            total_stocks_df = filtered_data["Total_Stocks"]
             
             # Display data table
             st.subheader("Total Stocks Data")
@@ -820,26 +1207,58 @@ if connection_status:
             
             # Line chart for NetValue_in_Cr
             try:
-                if not total_stocks_df.empty:
+                if len(total_stocks_df) > MAX_PLOT_POINTS:
+                    # Too many days to draw one by one: show each bucket's range as a
+                    # band around its mean
+                    bands = aggregate_for_plot(total_stocks_df, "NetValue_in_Cr")
+                    band_x = bands["Date"].to_numpy(dtype="datetime64[ms]")
+                    fig = go.Figure(
+                        data=[
+                            go.Scatter(
+                                x=band_x,
+                                y=bands["max"].to_numpy(),
+                                line=dict(width=0),
+                                showlegend=False,
+                                hoverinfo="skip"
+                            ),
+                            go.Scatter(
+                                x=band_x,
+                                y=bands["min"].to_numpy(),
+                                name="Min-Max Range",
+                                fill="tonexty",
+                                fillcolor="rgba(0, 0, 255, 0.2)",
+                                line=dict(width=0)
+                            ),
+                            go.Scatter(
+                                x=band_x,
+                                y=bands["mean"].to_numpy(),
+                                name="Mean Net Value (Cr)",
+                                line=dict(color="blue")
+                            )
+                        ],
+                        layout=dict(
+                            title="Stocks Net Value Over Time (Cr)",
+                            xaxis=dict(title="Date"),
+                            yaxis=dict(title="Net Value (Cr)"),
+                            **FONT_LAYOUT
+                        )
+                    )
+                    
+                    st.plotly_chart(fig, use_container_width=True, config=STATIC_CHART_CONFIG)
+                elif not total_stocks_df.empty:
                     fig = px.line(
                         total_stocks_df,
                         x="Date",
                         y="NetValue_in_Cr",
+                        render_mode="webgl",
                         title="Stocks Net Value Over Time (Cr)",
                         labels={"NetValue_in_Cr": "Net Value (Cr)", "Date": "Date"}
                     )
                     
                     # Update chart font size
-                    fig.update_layout(
-                        title_font=dict(size=20),
-                        legend_font=dict(size=20),
-                        xaxis_title_font=dict(size=20),
-                        yaxis_title_font=dict(size=20),
-                        xaxis_tickfont=dict(size=20),
-                        yaxis_tickfont=dict(size=20)
-                    )
+                    fig.update_layout(**FONT_LAYOUT)
                     
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(fig, use_container_width=True, config=STATIC_CHART_CONFIG)
                 else:
                     st.warning("No total stocks data available for the selected date range.")
             except Exception as e:
@@ -850,52 +1269,54 @@ if connection_status:
                 if "NSEI_Close" in total_stocks_df.columns and not total_stocks_df.empty:
                     st.subheader("Stocks Net Value vs Nifty Performance")
                     
-                    # Create two y-axes chart
-                    fig = go.Figure()
+                    # Downsample each series on its own, as each gets its own axis
+                    net_value_points = downsample(total_stocks_df, "NetValue_in_Cr")
+                    nifty_points = downsample(total_stocks_df, "NSEI_Close")
+                    scatter = go.Scattergl if len(net_value_points) > WEBGL_MIN_POINTS else go.Scatter
                     
-                    # First trace for Net Value
-                    fig.add_trace(
-                        go.Scatter(
-                            x=total_stocks_df["Date"],
-                            y=total_stocks_df["NetValue_in_Cr"],
-                            name="Net Value (Cr)",
-                            line=dict(color="blue")
-                        )
-                    )
+                    # Pass plain NumPy arrays so Plotly serialises contiguous buffers
+                    # instead of converting each Timestamp in a Series
+                    net_value_x = net_value_points["Date"].to_numpy(dtype="datetime64[ms]")
+                    net_value_y = net_value_points["NetValue_in_Cr"].to_numpy(dtype=np.float64)
+                    nifty_x = nifty_points["Date"].to_numpy(dtype="datetime64[ms]")
+                    nifty_y = nifty_points["NSEI_Close"].to_numpy(dtype=np.float64)
                     
-                    # Second trace for Nifty close price
-                    fig.add_trace(
-                        go.Scatter(
-                            x=total_stocks_df["Date"],
-                            y=total_stocks_df["NSEI_Close"],
-                            name="Nifty Close",
-                            line=dict(color="red"),
-                            yaxis="y2"
+                    # Create two y-axes chart with both traces and the layout in one call
+                    fig = go.Figure(
+                        data=[
+                            # First trace for Net Value
+                            scatter(
+                                x=net_value_x,
+                                y=net_value_y,
+                                name="Net Value (Cr)",
+                                line=dict(color="blue")
+                            ),
+                            # Second trace for Nifty close price
+                            scatter(
+                                x=nifty_x,
+                                y=nifty_y,
+                                name="Nifty Close",
+                                line=dict(color="red"),
+                                yaxis="y2"
+                            )
+                        ],
+                        layout=dict(
+                            title="Net Value vs Nifty Performance",
+                            xaxis=dict(title="Date"),
+                            yaxis=dict(title="Net Value (Cr)"),
+                            yaxis2=dict(
+                                title=dict(text="Nifty Close", font=dict(color="red", size=20)),
+                                tickfont=dict(color="red", size=20),
+                                anchor="x",
+                                overlaying="y",
+                                side="right"
+                            ),
+                            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                            **FONT_LAYOUT
                         )
                     )
                     
-                    # Update layout for two y-axes
-                    fig.update_layout(
-                        title="Net Value vs Nifty Performance",
-                        xaxis=dict(title="Date"),
-                        yaxis=dict(title="Net Value (Cr)"),
-                        yaxis2=dict(
-                            title=dict(text="Nifty Close", font=dict(color="red", size=20)),
-                            tickfont=dict(color="red", size=20),
-                            anchor="x",
-                            overlaying="y",
-                            side="right"
-                        ),
-                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                        title_font=dict(size=20),
-                        legend_font=dict(size=20),
-                        xaxis_title_font=dict(size=20),
-                        yaxis_title_font=dict(size=20),
-                        xaxis_tickfont=dict(size=20),
-                        yaxis_tickfont=dict(size=20)
-                    )
-                    
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(fig, use_container_width=True, config=STATIC_CHART_CONFIG)
             except Exception as e:
                 st.error(f"Error displaying Nifty comparison chart: {e}")
                 
@@ -923,18 +1344,22 @@ if connection_status:
                 # Apply analysis to STOCKS
                 if 'Date' in filtered_data["STOCKS"].columns:
                     # Get the current max date in the filtered data
-                    max_date = filtered_data["STOCKS"]["Date"].max()
+                    max_date = latest_dates["STOCKS"]
                     
                     # Calculate lookback date
                     lookback_date = max_date - pd.Timedelta(days=stocks_days_lookback)
                     
-                    # Get all data from the lookback period
-                    lookback_data = filtered_data["STOCKS"][filtered_data["STOCKS"]["Date"] >= lookback_date]
+                    # Get all data from the lookback period up to the latest date; rows
+                    # without a date sort after it and are left out
+                    stocks_dates = filtered_data["STOCKS"]["Date"]
+                    lookback_data = filtered_data["STOCKS"].iloc[
+                        stocks_dates.searchsorted(lookback_date):stocks_dates.searchsorted(max_date, side="right")
+                    ]
                     
                     if not lookback_data.empty:
                         # Get the earliest and latest dates for each stock in the lookback period
-                        earliest_data = lookback_data.sort_values("Date").groupby("Symbol").first().reset_index()
-                        latest_data = lookback_data.sort_values("Date").groupby("Symbol").last().reset_index()
+                        earliest_data = lookback_data.sort_values("Date").groupby("Symbol", observed=True).first().reset_index()
+                        latest_data = lookback_data.sort_values("Date").groupby("Symbol", observed=True).last().reset_index()
                         
                         # Rename columns to avoid confusion
                         earliest_data = earliest_data.rename(columns={
@@ -964,16 +1389,13 @@ if connection_status:
                         # Replace infinite values with NaN (happens when StartValue is 0)
                         merged_data["PctChange"].replace([float('inf'), float('-inf')], float('nan'), inplace=True)
                         
-                        # Filter based on threshold and minimum days
+                        # Filter on minimum days and threshold with a single combined mask
+                        # (NaN percentage changes fail both threshold comparisons)
                         min_days_required = max(1, stocks_days_lookback * 0.5)  # At least 50% of requested lookback period
-                        valid_data = merged_data[merged_data["DaysBetween"] >= min_days_required]
-                        
-                        # Drop rows with NaN percentage change
-                        valid_data = valid_data.dropna(subset=["PctChange"])
-                        
-                        significant_changes = valid_data[
-                            (valid_data["PctChange"] >= stocks_pct_threshold) | 
-                            (valid_data["PctChange"] <= -stocks_pct_threshold)
+                        pct_changes = merged_data["PctChange"]
+                        significant_changes = merged_data[
+                            (merged_data["DaysBetween"] >= min_days_required) & 
+                            ((pct_changes >= stocks_pct_threshold) | (pct_changes <= -stocks_pct_threshold))
                         ]
                         
                         # Sort by absolute percentage change (descending)
@@ -1015,14 +1437,7 @@ if connection_status:
                             )
                             
                             # Update layout
-                            fig.update_layout(
-                                title_font=dict(size=20),
-                                legend_font=dict(size=20),
-                                xaxis_title_font=dict(size=20),
-                                yaxis_title_font=dict(size=20),
-                                xaxis_tickfont=dict(size=20),
-                                yaxis_tickfont=dict(size=20)
-                            )
+                            fig.update_layout(**FONT_LAYOUT)
                             
                             # Add a horizontal line at y=0
                             fig.add_shape(
@@ -1048,15 +1463,18 @@ if connection_status:
                             
                             if selected_stock:
                                 # Get all data for the selected stock within the lookback period
-                                stock_trend_data = lookback_data[lookback_data["Symbol"] == selected_stock]
+                                stock_trend_data = lookback_data[lookback_data["Symbol"] == selected_stock].sort_values("Date")
                                 
                                 if not stock_trend_data.empty:
                                     # Create trend visualization
                                     st.subheader(f"{selected_stock} Net Value Trend (Last {stocks_days_lookback} Days)")
                                     
                                     # Show beginning and ending values
-                                    start_val = stock_trend_data.sort_values("Date")["NetValue_in_Cr"].iloc[0]
-                                    end_val = stock_trend_data.sort_values("Date")["NetValue_in_Cr"].iloc[-1]
+                                    trend_values = stock_trend_data["NetValue_in_Cr"]
+                                    first_date = stock_trend_data["Date"].iat[0]
+                                    last_date = stock_trend_data["Date"].iat[-1]
+                                    start_val = trend_values.iat[0]
+                                    end_val = trend_values.iat[-1]
                                     pct_change = ((end_val - start_val) / start_val) * 100 if start_val != 0 else float('nan')
                                     
                                     metric_cols = st.columns(3)
@@ -1070,7 +1488,7 @@ if connection_status:
                                     
                                     # Create the line chart
                                     fig = px.line(
-                                        stock_trend_data.sort_values("Date"),
+                                        stock_trend_data,
                                         x="Date",
                                         y="NetValue_in_Cr",
                                         title=f"{selected_stock} Net Value Trend",
@@ -1081,22 +1499,15 @@ if connection_status:
                                     # Add a reference line for the starting value
                                     fig.add_shape(
                                         type="line",
-                                        x0=stock_trend_data["Date"].min(),
+                                        x0=first_date,
                                         y0=start_val,
-                                        x1=stock_trend_data["Date"].max(),
+                                        x1=last_date,
                                         y1=start_val,
                                         line=dict(color="gray", width=1, dash="dash")
                                     )
                                     
                                     # Customize chart appearance
-                                    fig.update_layout(
-                                        title_font=dict(size=20),
-                                        legend_font=dict(size=20),
-                                        xaxis_title_font=dict(size=20),
-                                        yaxis_title_font=dict(size=20),
-                                        xaxis_tickfont=dict(size=20),
-                                        yaxis_tickfont=dict(size=20)
-                                    )
+                                    fig.update_layout(**FONT_LAYOUT)
                                     
                                     # Determine color based on trend
                                     line_color = "green" if pct_change >= 0 else "red"
@@ -1104,14 +1515,14 @@ if connection_status:
                                     
                                     # Add annotations for start and end points
                                     fig.add_annotation(
-                                        x=stock_trend_data["Date"].min(),
+                                        x=first_date,
                                         y=start_val,
                                         text="Start",
                                         showarrow=True,
                                         arrowhead=1
                                     )
                                     fig.add_annotation(
-                                        x=stock_trend_data["Date"].max(),
+                                        x=last_date,
                                         y=end_val,
                                         text="End",
                                         showarrow=True,
@@ -1125,10 +1536,10 @@ if connection_status:
                                         stats_df = pd.DataFrame({
                                             "Metric": ["Mean Value", "Max Value", "Min Value", "Standard Deviation", "Days Tracked"],
                                             "Value": [
-                                                f"₹{stock_trend_data['NetValue_in_Cr'].mean():,.2f} Cr",
-                                                f"₹{stock_trend_data['NetValue_in_Cr'].max():,.2f} Cr",
-                                                f"₹{stock_trend_data['NetValue_in_Cr'].min():,.2f} Cr",
-                                                f"₹{stock_trend_data['NetValue_in_Cr'].std():,.2f} Cr",
+                                                f"₹{trend_values.mean():,.2f} Cr",
+                                                f"₹{trend_values.max():,.2f} Cr",
+                                                f"₹{trend_values.min():,.2f} Cr",
+                                                f"₹{trend_values.std():,.2f} Cr",
                                                 f"{len(stock_trend_data)} days"
                                             ]
                                         })
@@ -1179,18 +1590,22 @@ if connection_status:
                 # Apply analysis to INDEX
                 if 'Date' in filtered_data["INDEX"].columns:
                     # Get the current max date in the filtered data
-                    max_date = filtered_data["INDEX"]["Date"].max()
+                    max_date = latest_dates["INDEX"]
                     
                     # Calculate lookback date
                     lookback_date = max_date - pd.Timedelta(days=index_days_lookback)
                     
-                    # Get all data from the lookback period
-                    lookback_data = filtered_data["INDEX"][filtered_data["INDEX"]["Date"] >= lookback_date]
+                    # Get all data from the lookback period up to the latest date; rows
+                    # without a date sort after it and are left out
+                    index_dates = filtered_data["INDEX"]["Date"]
+                    lookback_data = filtered_data["INDEX"].iloc[
+                        index_dates.searchsorted(lookback_date):index_dates.searchsorted(max_date, side="right")
+                    ]
                     
                     if not lookback_data.empty:
                         # Get the earliest and latest dates for each index in the lookback period
-                        earliest_data = lookback_data.sort_values("Date").groupby("Symbol").first().reset_index()
-                        latest_data = lookback_data.sort_values("Date").groupby("Symbol").last().reset_index()
+                        earliest_data = lookback_data.sort_values("Date").groupby("Symbol", observed=True).first().reset_index()
+                        latest_data = lookback_data.sort_values("Date").groupby("Symbol", observed=True).last().reset_index()
                         
                         # Rename columns to avoid confusion
                         earliest_data = earliest_data.rename(columns={
@@ -1220,16 +1635,13 @@ if connection_status:
                         # Replace infinite values with NaN (happens when StartValue is 0)
                         merged_data["PctChange"].replace([float('inf'), float('-inf')], float('nan'), inplace=True)
                         
-                        # Filter based on threshold and minimum days
+                        # Filter on minimum days and threshold with a single combined mask
+                        # (NaN percentage changes fail both threshold comparisons)
                         min_days_required = max(1, index_days_lookback * 0.5)  # At least 50% of requested lookback period
-                        valid_data = merged_data[merged_data["DaysBetween"] >= min_days_required]
-                        
-                        # Drop rows with NaN percentage change
-                        valid_data = valid_data.dropna(subset=["PctChange"])
-                        
-                        significant_changes = valid_data[
-                            (valid_data["PctChange"] >= index_pct_threshold) | 
-                            (valid_data["PctChange"] <= -index_pct_threshold)
+                        pct_changes = merged_data["PctChange"]
+                        significant_changes = merged_data[
+                            (merged_data["DaysBetween"] >= min_days_required) & 
+                            ((pct_changes >= index_pct_threshold) | (pct_changes <= -index_pct_threshold))
                         ]
                         
                         # Sort by absolute percentage change (descending)
@@ -1271,14 +1683,7 @@ if connection_status:
                             )
                             
                             # Update layout
-                            fig.update_layout(
-                                title_font=dict(size=20),
-                                legend_font=dict(size=20),
-                                xaxis_title_font=dict(size=20),
-                                yaxis_title_font=dict(size=20),
-                                xaxis_tickfont=dict(size=20),
-                                yaxis_tickfont=dict(size=20)
-                            )
+                            fig.update_layout(**FONT_LAYOUT)
                             
                             # Add a horizontal line at y=0
                             fig.add_shape(
@@ -1304,15 +1709,18 @@ if connection_status:
                             
                             if selected_index:
                                 # Get all data for the selected index within the lookback period
-                                index_trend_data = lookback_data[lookback_data["Symbol"] == selected_index]
+                                index_trend_data = lookback_data[lookback_data["Symbol"] == selected_index].sort_values("Date")
                                 
                                 if not index_trend_data.empty:
                                     # Create trend visualization
                                     st.subheader(f"{selected_index} Net Value Trend (Last {index_days_lookback} Days)")
                                     
                                     # Show beginning and ending values
-                                    start_val = index_trend_data.sort_values("Date")["NetValue_in_Cr"].iloc[0]
-                                    end_val = index_trend_data.sort_values("Date")["NetValue_in_Cr"].iloc[-1]
+                                    trend_values = index_trend_data["NetValue_in_Cr"]
+                                    first_date = index_trend_data["Date"].iat[0]
+                                    last_date = index_trend_data["Date"].iat[-1]
+                                    start_val = trend_values.iat[0]
+                                    end_val = trend_values.iat[-1]
                                     pct_change = ((end_val - start_val) / start_val) * 100 if start_val != 0 else float('nan')
                                     
                                     metric_cols = st.columns(3)
@@ -1326,7 +1734,7 @@ if connection_status:
                                     
                                     # Create the line chart
                                     fig = px.line(
-                                        index_trend_data.sort_values("Date"),
+                                        index_trend_data,
                                         x="Date",
                                         y="NetValue_in_Cr",
                                         title=f"{selected_index} Net Value Trend",
@@ -1337,22 +1745,15 @@ if connection_status:
                                     # Add a reference line for the starting value
                                     fig.add_shape(
                                         type="line",
-                                        x0=index_trend_data["Date"].min(),
+                                        x0=first_date,
                                         y0=start_val,
-                                        x1=index_trend_data["Date"].max(),
+                                        x1=last_date,
                                         y1=start_val,
                                         line=dict(color="gray", width=1, dash="dash")
                                     )
                                     
                                     # Customize chart appearance
-                                    fig.update_layout(
-                                        title_font=dict(size=20),
-                                        legend_font=dict(size=20),
-                                        xaxis_title_font=dict(size=20),
-                                        yaxis_title_font=dict(size=20),
-                                        xaxis_tickfont=dict(size=20),
-                                        yaxis_tickfont=dict(size=20)
-                                    )
+                                    fig.update_layout(**FONT_LAYOUT)
                                     
                                     # Determine color based on trend
                                     line_color = "green" if pct_change >= 0 else "red"
@@ -1360,14 +1761,14 @@ if connection_status:
                                     
                                     # Add annotations for start and end points
                                     fig.add_annotation(
-                                        x=index_trend_data["Date"].min(),
+                                        x=first_date,
                                         y=start_val,
                                         text="Start",
                                         showarrow=True,
                                         arrowhead=1
                                     )
                                     fig.add_annotation(
-                                        x=index_trend_data["Date"].max(),
+                                        x=last_date,
                                         y=end_val,
                                         text="End",
                                         showarrow=True,
@@ -1381,10 +1782,10 @@ if connection_status:
                                         stats_df = pd.DataFrame({
                                             "Metric": ["Mean Value", "Max Value", "Min Value", "Standard Deviation", "Days Tracked"],
                                             "Value": [
-                                                f"₹{index_trend_data['NetValue_in_Cr'].mean():,.2f} Cr",
-                                                f"₹{index_trend_data['NetValue_in_Cr'].max():,.2f} Cr",
-                                                f"₹{index_trend_data['NetValue_in_Cr'].min():,.2f} Cr",
-                                                f"₹{index_trend_data['NetValue_in_Cr'].std():,.2f} Cr",
+                                                f"₹{trend_values.mean():,.2f} Cr",
+                                                f"₹{trend_values.max():,.2f} Cr",
+                                                f"₹{trend_values.min():,.2f} Cr",
+                                                f"₹{trend_values.std():,.2f} Cr",
                                                 f"{len(index_trend_data)} days"
                                             ]
                                         })
@@ -1442,18 +1843,22 @@ if connection_status:
                 # Apply analysis to STOCKS
                 if 'Date' in filtered_data["STOCKS"].columns:
                     # Get the current max date in the filtered data
-                    max_date = filtered_data["STOCKS"]["Date"].max()
+                    max_date = latest_dates["STOCKS"]
                     
                     # Calculate lookback date
                     lookback_date = max_date - pd.Timedelta(days=stocks_qty_days_lookback)
                     
-                    # Get all data from the lookback period
-                    lookback_data = filtered_data["STOCKS"][filtered_data["STOCKS"]["Date"] >= lookback_date]
+                    # Get all data from the lookback period up to the latest date; rows
+                    # without a date sort after it and are left out
+                    stocks_dates = filtered_data["STOCKS"]["Date"]
+                    lookback_data = filtered_data["STOCKS"].iloc[
+                        stocks_dates.searchsorted(lookback_date):stocks_dates.searchsorted(max_date, side="right")
+                    ]
                     
                     if not lookback_data.empty:
                         # Get the earliest and latest dates for each stock in the lookback period
-                        earliest_data = lookback_data.sort_values("Date").groupby("Symbol").first().reset_index()
-                        latest_data = lookback_data.sort_values("Date").groupby("Symbol").last().reset_index()
+                        earliest_data = lookback_data.sort_values("Date").groupby("Symbol", observed=True).first().reset_index()
+                        latest_data = lookback_data.sort_values("Date").groupby("Symbol", observed=True).last().reset_index()
                         
                         # Rename columns to avoid confusion
                         earliest_data = earliest_data.rename(columns={
@@ -1483,16 +1888,13 @@ if connection_status:
                         # Replace infinite values with NaN (happens when StartQty is 0)
                         merged_data["PctChange"].replace([float('inf'), float('-inf')], float('nan'), inplace=True)
                         
-                        # Filter based on threshold and minimum days
+                        # Filter on minimum days and threshold with a single combined mask
+                        # (NaN percentage changes fail both threshold comparisons)
                         min_days_required = max(1, stocks_qty_days_lookback * 0.5)  # At least 50% of requested lookback period
-                        valid_data = merged_data[merged_data["DaysBetween"] >= min_days_required]
-                        
-                        # Drop rows with NaN percentage change
-                        valid_data = valid_data.dropna(subset=["PctChange"])
-                        
-                        significant_changes = valid_data[
-                            (valid_data["PctChange"] >= stocks_qty_pct_threshold) | 
-                            (valid_data["PctChange"] <= -stocks_qty_pct_threshold)
+                        pct_changes = merged_data["PctChange"]
+                        significant_changes = merged_data[
+                            (merged_data["DaysBetween"] >= min_days_required) & 
+                            ((pct_changes >= stocks_qty_pct_threshold) | (pct_changes <= -stocks_qty_pct_threshold))
                         ]
                         
                         # Sort by absolute percentage change (descending)
@@ -1534,14 +1936,7 @@ if connection_status:
                             )
                             
                             # Update layout
-                            fig.update_layout(
-                                title_font=dict(size=20),
-                                legend_font=dict(size=20),
-                                xaxis_title_font=dict(size=20),
-                                yaxis_title_font=dict(size=20),
-                                xaxis_tickfont=dict(size=20),
-                                yaxis_tickfont=dict(size=20)
-                            )
+                            fig.update_layout(**FONT_LAYOUT)
                             
                             # Add a horizontal line at y=0
                             fig.add_shape(
@@ -1567,15 +1962,18 @@ if connection_status:
                             
                             if selected_stock:
                                 # Get all data for the selected stock within the lookback period
-                                stock_trend_data = lookback_data[lookback_data["Symbol"] == selected_stock]
+                                stock_trend_data = lookback_data[lookback_data["Symbol"] == selected_stock].sort_values("Date")
                                 
                                 if not stock_trend_data.empty:
                                     # Create trend visualization
                                     st.subheader(f"{selected_stock} Net Quantity Trend (Last {stocks_qty_days_lookback} Days)")
                                     
                                     # Show beginning and ending values
-                                    start_val = stock_trend_data.sort_values("Date")["NetQtyCarryFwd"].iloc[0]
-                                    end_val = stock_trend_data.sort_values("Date")["NetQtyCarryFwd"].iloc[-1]
+                                    trend_values = stock_trend_data["NetQtyCarryFwd"]
+                                    first_date = stock_trend_data["Date"].iat[0]
+                                    last_date = stock_trend_data["Date"].iat[-1]
+                                    start_val = trend_values.iat[0]
+                                    end_val = trend_values.iat[-1]
                                     pct_change = ((end_val - start_val) / start_val) * 100 if start_val != 0 else float('nan')
                                     
                                     metric_cols = st.columns(3)
@@ -1589,7 +1987,7 @@ if connection_status:
                                     
                                     # Create the line chart
                                     fig = px.line(
-                                        stock_trend_data.sort_values("Date"),
+                                        stock_trend_data,
                                         x="Date",
                                         y="NetQtyCarryFwd",
                                         title=f"{selected_stock} Net Quantity Trend",
@@ -1600,22 +1998,15 @@ if connection_status:
                                     # Add a reference line for the starting value
                                     fig.add_shape(
                                         type="line",
-                                        x0=stock_trend_data["Date"].min(),
+                                        x0=first_date,
                                         y0=start_val,
-                                        x1=stock_trend_data["Date"].max(),
+                                        x1=last_date,
                                         y1=start_val,
                                         line=dict(color="gray", width=1, dash="dash")
                                     )
                                     
                                     # Customize chart appearance
-                                    fig.update_layout(
-                                        title_font=dict(size=20),
-                                        legend_font=dict(size=20),
-                                        xaxis_title_font=dict(size=20),
-                                        yaxis_title_font=dict(size=20),
-                                        xaxis_tickfont=dict(size=20),
-                                        yaxis_tickfont=dict(size=20)
-                                    )
+                                    fig.update_layout(**FONT_LAYOUT)
                                     
                                     # Determine color based on trend
                                     line_color = "green" if pct_change >= 0 else "red"
@@ -1623,14 +2014,14 @@ if connection_status:
                                     
                                     # Add annotations for start and end points
                                     fig.add_annotation(
-                                        x=stock_trend_data["Date"].min(),
+                                        x=first_date,
                                         y=start_val,
                                         text="Start",
                                         showarrow=True,
                                         arrowhead=1
                                     )
                                     fig.add_annotation(
-                                        x=stock_trend_data["Date"].max(),
+                                        x=last_date,
                                         y=end_val,
                                         text="End",
                                         showarrow=True,
@@ -1644,10 +2035,10 @@ if connection_status:
                                         stats_df = pd.DataFrame({
                                             "Metric": ["Mean Quantity", "Max Quantity", "Min Quantity", "Standard Deviation", "Days Tracked"],
                                             "Value": [
-                                                f"{stock_trend_data['NetQtyCarryFwd'].mean():,.0f}",
-                                                f"{stock_trend_data['NetQtyCarryFwd'].max():,.0f}",
-                                                f"{stock_trend_data['NetQtyCarryFwd'].min():,.0f}",
-                                                f"{stock_trend_data['NetQtyCarryFwd'].std():,.0f}",
+                                                f"{trend_values.mean():,.0f}",
+                                                f"{trend_values.max():,.0f}",
+                                                f"{trend_values.min():,.0f}",
+                                                f"{trend_values.std():,.0f}",
                                                 f"{len(stock_trend_data)} days"
                                             ]
                                         })
@@ -1698,18 +2089,22 @@ if connection_status:
                 # Apply analysis to INDEX
                 if 'Date' in filtered_data["INDEX"].columns:
                     # Get the current max date in the filtered data
-                    max_date = filtered_data["INDEX"]["Date"].max()
+                    max_date = latest_dates["INDEX"]
                     
                     # Calculate lookback date
                     lookback_date = max_date - pd.Timedelta(days=index_qty_days_lookback)
                     
-                    # Get all data from the lookback period
-                    lookback_data = filtered_data["INDEX"][filtered_data["INDEX"]["Date"] >= lookback_date]
+                    # Get all data from the lookback period up to the latest date; rows
+                    # without a date sort after it and are left out
+                    index_dates = filtered_data["INDEX"]["Date"]
+                    lookback_data = filtered_data["INDEX"].iloc[
+                        index_dates.searchsorted(lookback_date):index_dates.searchsorted(max_date, side="right")
+                    ]
                     
                     if not lookback_data.empty:
                         # Get the earliest and latest dates for each index in the lookback period
-                        earliest_data = lookback_data.sort_values("Date").groupby("Symbol").first().reset_index()
-                        latest_data = lookback_data.sort_values("Date").groupby("Symbol").last().reset_index()
+                        earliest_data = lookback_data.sort_values("Date").groupby("Symbol", observed=True).first().reset_index()
+                        latest_data = lookback_data.sort_values("Date").groupby("Symbol", observed=True).last().reset_index()
                         
                         # Rename columns to avoid confusion
                         earliest_data = earliest_data.rename(columns={
@@ -1739,16 +2134,13 @@ if connection_status:
                         # Replace infinite values with NaN (happens when StartQty is 0)
                         merged_data["PctChange"].replace([float('inf'), float('-inf')], float('nan'), inplace=True)
                         
-                        # Filter based on threshold and minimum days
+                        # Filter on minimum days and threshold with a single combined mask
+                        # (NaN percentage changes fail both threshold comparisons)
                         min_days_required = max(1, index_qty_days_lookback * 0.5)  # At least 50% of requested lookback period
-                        valid_data = merged_data[merged_data["DaysBetween"] >= min_days_required]
-                        
-                        # Drop rows with NaN percentage change
-                        valid_data = valid_data.dropna(subset=["PctChange"])
-                        
-                        significant_changes = valid_data[
-                            (valid_data["PctChange"] >= index_qty_pct_threshold) | 
-                            (valid_data["PctChange"] <= -index_qty_pct_threshold)
+                        pct_changes = merged_data["PctChange"]
+                        significant_changes = merged_data[
+                            (merged_data["DaysBetween"] >= min_days_required) & 
+                            ((pct_changes >= index_qty_pct_threshold) | (pct_changes <= -index_qty_pct_threshold))
                         ]
                         
                         # Sort by absolute percentage change (descending)
@@ -1790,14 +2182,7 @@ if connection_status:
                             )
                             
                             # Update layout
-                            fig.update_layout(
-                                title_font=dict(size=20),
-                                legend_font=dict(size=20),
-                                xaxis_title_font=dict(size=20),
-                                yaxis_title_font=dict(size=20),
-                                xaxis_tickfont=dict(size=20),
-                                yaxis_tickfont=dict(size=20)
-                            )
+                            fig.update_layout(**FONT_LAYOUT)
                             
                             # Add a horizontal line at y=0
                             fig.add_shape(
@@ -1823,15 +2208,18 @@ if connection_status:
                             
                             if selected_index:
                                 # Get all data for the selected index within the lookback period
-                                index_trend_data = lookback_data[lookback_data["Symbol"] == selected_index]
+                                index_trend_data = lookback_data[lookback_data["Symbol"] == selected_index].sort_values("Date")
                                 
                                 if not index_trend_data.empty:
                                     # Create trend visualization
                                     st.subheader(f"{selected_index} Net Quantity Trend (Last {index_qty_days_lookback} Days)")
                                     
                                     # Show beginning and ending values
-                                    start_val = index_trend_data.sort_values("Date")["NetQtyCarryFwd"].iloc[0]
-                                    end_val = index_trend_data.sort_values("Date")["NetQtyCarryFwd"].iloc[-1]
+                                    trend_values = index_trend_data["NetQtyCarryFwd"]
+                                    first_date = index_trend_data["Date"].iat[0]
+                                    last_date = index_trend_data["Date"].iat[-1]
+                                    start_val = trend_values.iat[0]
+                                    end_val = trend_values.iat[-1]
                                     pct_change = ((end_val - start_val) / start_val) * 100 if start_val != 0 else float('nan')
                                     
                                     metric_cols = st.columns(3)
@@ -1845,7 +2233,7 @@ if connection_status:
                                     
                                     # Create the line chart
                                     fig = px.line(
-                                        index_trend_data.sort_values("Date"),
+                                        index_trend_data,
                                         x="Date",
                                         y="NetQtyCarryFwd",
                                         title=f"{selected_index} Net Quantity Trend",
@@ -1856,22 +2244,15 @@ if connection_status:
                                     # Add a reference line for the starting value
                                     fig.add_shape(
                                         type="line",
-                                        x0=index_trend_data["Date"].min(),
+                                        x0=first_date,
                                         y0=start_val,
-                                        x1=index_trend_data["Date"].max(),
+                                        x1=last_date,
                                         y1=start_val,
                                         line=dict(color="gray", width=1, dash="dash")
                                     )
                                     
                                     # Customize chart appearance
-                                    fig.update_layout(
-                                        title_font=dict(size=20),
-                                        legend_font=dict(size=20),
-                                        xaxis_title_font=dict(size=20),
-                                        yaxis_title_font=dict(size=20),
-                                        xaxis_tickfont=dict(size=20),
-                                        yaxis_tickfont=dict(size=20)
-                                    )
+                                    fig.update_layout(**FONT_LAYOUT)
                                     
                                     # Determine color based on trend
                                     line_color = "green" if pct_change >= 0 else "red"
@@ -1879,14 +2260,14 @@ if connection_status:
                                     
                                     # Add annotations for start and end points
                                     fig.add_annotation(
-                                        x=index_trend_data["Date"].min(),
+                                        x=first_date,
                                         y=start_val,
                                         text="Start",
                                         showarrow=True,
                                         arrowhead=1
                                     )
                                     fig.add_annotation(
-                                        x=index_trend_data["Date"].max(),
+                                        x=last_date,
                                         y=end_val,
                                         text="End",
                                         showarrow=True,
@@ -1900,10 +2281,10 @@ if connection_status:
                                         stats_df = pd.DataFrame({
                                             "Metric": ["Mean Quantity", "Max Quantity", "Min Quantity", "Standard Deviation", "Days Tracked"],
                                             "Value": [
-                                                f"{index_trend_data['NetQtyCarryFwd'].mean():,.0f}",
-                                                f"{index_trend_data['NetQtyCarryFwd'].max():,.0f}",
-                                                f"{index_trend_data['NetQtyCarryFwd'].min():,.0f}",
-                                                f"{index_trend_data['NetQtyCarryFwd'].std():,.0f}",
+                                                f"{trend_values.mean():,.0f}",
+                                                f"{trend_values.max():,.0f}",
+                                                f"{trend_values.min():,.0f}",
+                                                f"{trend_values.std():,.0f}",
                                                 f"{len(index_trend_data)} days"
                                             ]
                                         })
@@ -1941,56 +2322,53 @@ if connection_status:
         with tab8:
             st.header("Raw Data")
             
-            # Define columns to hide by default for each table
-            columns_to_hide = {
-                "INDEX": ["id", "created_at", "updated_at", "BtFrwdLongQty", "BtFrwdShortQty"],
-                "STOCKS": ["id", "created_at", "updated_at", "BtFrwdLongQty", "BtFrwdShortQty"],
-                "SUMMARY": ["id", "created_at", "updated_at"],
-                "Total_Index": ["id", "created_at", "updated_at"],
-                "Total_Stocks": ["id", "created_at", "updated_at"]
-            }
-            
             # Toggle for showing all columns
             show_all_columns = st.checkbox("Show All Columns", value=False)
             
-            # Create subtabs for each table
-            sheet_tabs = st.tabs(list(data.keys()))
+            # Render only the selected table instead of building a subtab for every table
+            sheet_name = st.selectbox("Select Table", list(data.keys()), key="raw_data_sheet")
             
-            for i, sheet_name in enumerate(data.keys()):
-                with sheet_tabs[i]:
-                    st.subheader(f"{sheet_name} Data")
-                    
-                    # Filter columns if needed
-                    display_df = data[sheet_name].copy()
-                    
-                    if not show_all_columns and sheet_name in columns_to_hide:
-                        # Filter out columns that should be hidden
-                        cols_to_hide = [col for col in columns_to_hide[sheet_name] if col in display_df.columns]
-                        display_df = display_df.drop(columns=cols_to_hide)
-                    
-                    # Display the filtered dataframe
-                    st.dataframe(display_df, use_container_width=True)
-                    
-                    # Add download button for each table (always with all columns)
-                    csv = data[sheet_name].to_csv(index=False).encode('utf-8')
-                    st.download_button(
-                        label=f"Download {sheet_name} as CSV",
-                        data=csv,
-                        file_name=f"{sheet_name}.csv",
-                        mime="text/csv",
-                    )
-                    
-                    # Show column selector for custom view
-                    if st.checkbox(f"Custom Column Selection for {sheet_name}", value=False):
-                        all_columns = list(data[sheet_name].columns)
-                        selected_columns = st.multiselect(
-                            f"Select columns to display for {sheet_name}",
-                            all_columns,
-                            default=[col for col in all_columns if col not in columns_to_hide.get(sheet_name, [])]
-                        )
-                        
-                        if selected_columns:
-                            st.dataframe(data[sheet_name][selected_columns], use_container_width=True)
+            st.subheader(f"{sheet_name} Data")
+            
+            # Page through the table instead of sending every row to the browser
+            total_rows = len(data[sheet_name])
+            page_col, rows_col = st.columns(2)
+            with rows_col:
+                rows_per_page = st.selectbox("Rows per page", [100, 500, 1000], index=2, key="raw_data_rows")
+            with page_col:
+                page_count = max(1, -(-total_rows // rows_per_page))
+                page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+            first_row = (page - 1) * rows_per_page
+            
+            # Reserve the table's place; it is filled once the column selection is known
+            table_placeholder = st.empty()
+            st.caption(f"Showing rows {min(first_row + 1, total_rows):,}-{min(first_row + rows_per_page, total_rows):,} of {total_rows:,}")
+            
+            # Add download button for the table (always with all columns);
+            # the CSV is only built once the button is actually clicked
+            st.download_button(
+                label=f"Download {sheet_name} as CSV",
+                data=lambda data=data, data_version=data_version, sheet_name=sheet_name: load_csv_bytes(data, data_version, sheet_name),
+                file_name=f"{sheet_name}.csv",
+                mime="text/csv",
+            )
+            
+            # Show column selector for custom view
+            selected_columns = None
+            if st.checkbox(f"Custom Column Selection for {sheet_name}", value=False):
+                selected_columns = st.multiselect(
+                    f"Select columns to display for {sheet_name}",
+                    load_visible_columns(data, data_version, sheet_name, True),
+                    default=load_visible_columns(data, data_version, sheet_name, False)
+                )
+            
+            # Display a single table: the custom selection if there is one,
+            # otherwise the table with hidden columns filtered as needed
+            display_columns = selected_columns or load_visible_columns(data, data_version, sheet_name, show_all_columns)
+            # Slice the page out of the loaded frame first, so only those rows are
+            # copied and converted for the browser
+            page_df = data[sheet_name].iloc[first_row:first_row + rows_per_page][list(display_columns)]
+            table_placeholder.dataframe(page_df, use_container_width=True, hide_index=True)
 
         # Add information and credits
         st.sidebar.markdown("---")